@@ -1,9 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from data_utils import load_data, prepare_dataframe
-from planets import PLANETS, add_planet_orbits
-from orbit_calculations import compute_object_positions, add_object_orbits
+from datetime import datetime, timezone
+from data_utils import load_data, prepare_dataframe, load_komet_lookup_table, load_position_index
+from classification import classify_dataframe
+from planets import PLANETS, add_planet_orbits, planet_positions, planet_index, julian_date
+from orbit_calculations import compute_object_positions, add_object_orbits, add_highlighted_objects
+from proximity import query_radius, query_nearest
 from plot_utils import setup_plot
 
 st.set_page_config(page_title="Solar System Visualizer", layout="wide")
@@ -16,8 +20,12 @@ FILE_MAPPING = {
     "2. Familien (DBSCAN Cluster)": "csvs/clustered_families_dbscan.csv",
     "3. Familien (K-Means Cluster)": "csvs/clustered_families_kmeans.csv",
     "4. Komet vs. Asteroid (K-Means)": "csvs/clustered_kometVsAsteroid_kmeans.csv",
-    "5. Komet vs. Asteroid (DBSCAN)": "csvs/clustered_kometVsAsteroid_dbscan.csv"
+    "5. Komet vs. Asteroid (DBSCAN)": "csvs/clustered_kometVsAsteroid_dbscan.csv",
+    "6. Komet vs. Asteroid (Lookup, alle Objekte)": "sbdb_query_results.csv"
 }
+
+# Quellen, die beim Laden per Lookup-Tabelle klassifiziert werden
+LOOKUP_CLASSIFIED = {"6. Komet vs. Asteroid (Lookup, alle Objekte)"}
 # --- ENDE MAPPING ---
 
 # --- CSV-Auswahl in der Sidebar ---
@@ -38,6 +46,15 @@ cluster_column = "cluster"
 # --- Daten laden ---
 df = load_data(csv_file)
 df = prepare_dataframe(df)
+if display_name in LOOKUP_CLASSIFIED:
+    df = classify_dataframe(df, load_komet_lookup_table(), cluster_column=cluster_column)
+
+# Vollständiger Katalog (vor den Filtern) für die Nachbarschaftssuche
+catalog = df
+
+# Gemeinsame Epoche für Planeten und Objekte (auf den Tag gerundet, damit der Index gecacht bleibt)
+now = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+now_jd = julian_date(now)
 
 # --- Sidebar ---
 st.sidebar.header("🔍 Anzeigeoptionen")
@@ -72,6 +89,59 @@ if only_tg422:
     df = df[df["full_name"].str.contains("TG422", case=False, na=False)]
 
 
+# --- Nachbarschaftssuche ---
+st.sidebar.header("📡 Nachbarschaftssuche")
+proximity_active = st.sidebar.toggle("Objekte in der Nähe suchen", value=False)
+
+# Maximale Anzahl angezeigter Treffer (Tabelle und Hervorhebung)
+MAX_MATCHES = 2000
+
+matches = None
+if proximity_active:
+    position_index = load_position_index(csv_file, now_jd)
+
+    center_type = st.sidebar.radio("Zentrum", ["Planet", "Objekt"], horizontal=True)
+    center, center_row, center_label = None, None, None
+    if center_type == "Planet":
+        center_label = st.sidebar.selectbox("Planet", list(PLANETS["name"]), index=2)
+        center = planet_positions(PLANETS, now_jd)[planet_index(PLANETS, center_label)]
+    elif "full_name" in catalog.columns:
+        name_query = st.sidebar.text_input("Objektname (Teil des Namens)", value="")
+        if name_query:
+            candidates = np.flatnonzero(
+                catalog["full_name"].str.contains(name_query, case=False, na=False, regex=False).to_numpy()
+            )[:50]
+            if len(candidates) > 0:
+                center_row = st.sidebar.selectbox(
+                    "Objekt",
+                    candidates,
+                    format_func=lambda row: catalog["full_name"].iloc[row],
+                )
+                center_label = catalog["full_name"].iloc[center_row]
+                center = position_index["positions"][center_row]
+            else:
+                st.sidebar.info("Kein Objekt mit diesem Namen gefunden.")
+    else:
+        st.sidebar.info("Die CSV enthält keine Spalte 'full_name'.")
+
+    search_mode = st.sidebar.radio("Suche", ["Radius", "k nächste"], horizontal=True)
+    if search_mode == "Radius":
+        radius = st.sidebar.number_input("Radius [AE]", min_value=0.001, value=0.1, step=0.05, format="%.3f")
+    else:
+        k_nearest = int(st.sidebar.number_input("Anzahl Nachbarn (k)", min_value=1, max_value=MAX_MATCHES, value=10))
+
+    if center is not None and np.isfinite(center).all():
+        if search_mode == "Radius":
+            rows, dist = query_radius(position_index, center, radius, exclude=center_row)
+        else:
+            rows, dist = query_nearest(position_index, center, k_nearest, exclude=center_row)
+        matches = catalog.iloc[rows[:MAX_MATCHES]].copy()
+        matches.insert(0, "Abstand [AE]", dist[:MAX_MATCHES])
+        st.sidebar.markdown(f"**Treffer um {center_label}:** {len(rows):,}")
+    elif center is not None:
+        st.sidebar.info("Für dieses Objekt ist keine Position berechenbar.")
+
+
 # --- Level of Detail ---
 inner = df[df["a"] <= 5]
 outer = df[df["a"] > 5]
@@ -119,9 +189,20 @@ st.sidebar.markdown(f"**Gesamt verfügbar (ungf.):** {len(load_data(csv_file)):,
 
 # --- Plot aufbauen ---
 fig = setup_plot()
-add_planet_orbits(fig, PLANETS)
-compute_object_positions(fig, objs, cluster_column=cluster_column)
+add_planet_orbits(fig, PLANETS, now)
+compute_object_positions(fig, objs, cluster_column=cluster_column, jd=now_jd)
 if show_orbits:
     add_object_orbits(fig, objs_orbits, cluster_column=cluster_column)
-
-st.plotly_chart(fig, config={"responsive": True, "displayModeBar": True})
\ No newline at end of file
+if matches is not None and not matches.empty:
+    add_highlighted_objects(fig, matches, jd=now_jd)
+
+st.plotly_chart(fig, config={"responsive": True, "displayModeBar": True})
+
+# --- Trefferliste der Nachbarschaftssuche ---
+if matches is not None:
+    st.subheader("📡 Objekte in der Nähe")
+    if matches.empty:
+        st.info("Keine Objekte im gewählten Bereich.")
+    else:
+        table_columns = [c for c in ["Abstand [AE]", "full_name", "a", "e", "i", cluster_column] if c in matches.columns]
+        st.dataframe(matches[table_columns], hide_index=True)
\ No newline at end of file
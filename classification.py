@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from planets import PLANETS, planet_index
+
+# Große Halbachse von Jupiter (AE) als Referenz für den Tisserand-Parameter
+A_JUPITER = PLANETS["a"][planet_index(PLANETS, "Jupiter")]
+
+# Standard-Raster der Lookup-Tabelle über die (t_jup, i)-Ebene
+# (der t_jup-Bereich ergibt sich aus den gelabelten Daten)
+I_RANGE = (0.0, 180.0)
+T_JUP_STEP = 0.01
+I_STEP = 0.25
+
+# Nachbarschaftsradius von DBSCAN in kometVsAsteroid.ipynb (in Standardabweichungen)
+DBSCAN_EPS = 0.3
+
+# Label für Objekte ohne Cluster (wie DBSCAN-Rauschen)
+NOISE_LABEL = -1
+
+
+def tisserand_jupiter(a, e, i):
+    """
+    Berechnet den Tisserand-Parameter bezüglich Jupiter (vektorisiert).
+    T_J = a_J/a + 2*cos(i)*sqrt((a/a_J)*(1 - e^2)), i in Grad.
+    """
+    a = np.asarray(a, dtype=float)
+    e = np.asarray(e, dtype=float)
+    inc = np.radians(np.asarray(i, dtype=float))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return A_JUPITER / a + 2 * np.cos(inc) * np.sqrt((a / A_JUPITER) * (1 - e**2))
+
+
+def fill_t_jup(df):
+    """
+    Ergänzt die Spalte 't_jup' aus a, e, i überall dort, wo sie fehlt.
+    Gibt eine Kopie des DataFrames zurück.
+    """
+    df = df.copy()
+    if "t_jup" in df.columns:
+        t_jup = pd.to_numeric(df["t_jup"], errors="coerce").to_numpy(dtype=float, copy=True)
+    else:
+        t_jup = np.full(len(df), np.nan)
+
+    missing = np.isnan(t_jup)
+    if missing.any():
+        t_jup[missing] = tisserand_jupiter(
+            df["a"].to_numpy(dtype=float)[missing],
+            df["e"].to_numpy(dtype=float)[missing],
+            df["i"].to_numpy(dtype=float)[missing],
+        )
+    df["t_jup"] = t_jup
+    return df
+
+
+def _edges(value_range, step):
+    n_bins = int(np.ceil((value_range[1] - value_range[0]) / step - 1e-9))
+    return value_range[0] + step * np.arange(n_bins + 1)
+
+
+def _cell_index(t_edges, i_edges, t_jup, i):
+    """
+    Flacher Zellindex je Objekt, -1 für NaN.
+    Werte außerhalb des Rasters landen in der jeweiligen Randzelle.
+    """
+    t_jup = np.asarray(t_jup, dtype=float)
+    i = np.asarray(i, dtype=float)
+    n_t, n_i = len(t_edges) - 1, len(i_edges) - 1
+
+    # Gleichmäßiges Raster -> Index direkt berechnen statt suchen
+    with np.errstate(invalid="ignore"):
+        t_idx = np.clip(np.floor((t_jup - t_edges[0]) / (t_edges[1] - t_edges[0])), 0, n_t - 1)
+        i_idx = np.clip(np.floor((i - i_edges[0]) / (i_edges[1] - i_edges[0])), 0, n_i - 1)
+
+    valid = np.isfinite(t_idx) & np.isfinite(i_idx)
+    cell = np.full(t_jup.shape, -1, dtype=np.int64)
+    cell[valid] = t_idx[valid].astype(np.int64) * n_i + i_idx[valid].astype(np.int64)
+    return cell
+
+
+def build_lookup_table(t_jup, i, labels, eps=DBSCAN_EPS, t_jup_step=T_JUP_STEP, i_step=I_STEP,
+                       i_range=I_RANGE, fill_label=NOISE_LABEL):
+    """
+    Überführt ein gefittetes DBSCAN-Clustering (kometVsAsteroid.ipynb) in eine
+    Lookup-Tabelle über die (t_jup, i)-Ebene.
+    Wie bei DBSCAN wird im StandardScaler-Raum gearbeitet: jeder Zellmittelpunkt
+    erhält das Label des nächsten geclusterten Objekts innerhalb von 'eps',
+    weiter entfernte Zellen gelten als Rauschen ('fill_label').
+    """
+    t_jup = np.asarray(t_jup, dtype=float)
+    i = np.asarray(i, dtype=float)
+    labels = np.asarray(labels)
+
+    ok = np.isfinite(t_jup) & np.isfinite(i)
+    t_jup, i, labels = t_jup[ok], i[ok], labels[ok]
+
+    # Skalierung wie StandardScaler im Notebook
+    mean = np.array([t_jup.mean(), i.mean()])
+    scale = np.array([t_jup.std(), i.std()])
+
+    # Raster deckt alle Daten plus eps-Rand ab, außerhalb wird auf die Randzellen geklemmt
+    t_range = (t_jup.min() - eps * scale[0], t_jup.max() + eps * scale[0])
+    t_edges = _edges(t_range, t_jup_step)
+    i_edges = _edges(i_range, i_step)
+
+    # Nur geclusterte Objekte können ein Label weitergeben
+    clustered = labels != fill_label
+    points = (np.column_stack([t_jup, i])[clustered] - mean) / scale
+    tree = cKDTree(points)
+
+    t_mid = ((t_edges[:-1] + t_edges[1:]) / 2 - mean[0]) / scale[0]
+    i_mid = ((i_edges[:-1] + i_edges[1:]) / 2 - mean[1]) / scale[1]
+    centers = np.column_stack([
+        np.repeat(t_mid, len(i_mid)),
+        np.tile(i_mid, len(t_mid)),
+    ])
+    _, nearest = tree.query(centers, distance_upper_bound=eps)
+
+    # Treffer außerhalb von eps liefert cKDTree als Index len(points)
+    cluster_labels = np.append(labels[clustered], fill_label).astype(np.int16)
+    table = cluster_labels[nearest]
+
+    return {
+        "t_edges": t_edges,
+        "i_edges": i_edges,
+        "labels": table.reshape(len(t_mid), len(i_mid)),
+        "fill_label": fill_label,
+    }
+
+
+def classify(table, t_jup, i):
+    """Ordnet Objekte per einmaligem, vektorisiertem Tabellenzugriff einem Cluster zu."""
+    cell = _cell_index(table["t_edges"], table["i_edges"], t_jup, i)
+    flat = table["labels"].ravel()
+    return np.where(cell >= 0, flat[np.maximum(cell, 0)], table["fill_label"])
+
+
+def classify_dataframe(df, table, cluster_column="cluster"):
+    """
+    Klassifiziert alle Objekte eines Katalogs (Komet vs. Asteroid).
+    Fehlende 't_jup'-Werte werden vorher aus a, e, i berechnet.
+    """
+    df = fill_t_jup(df)
+    df[cluster_column] = classify(table, df["t_jup"].to_numpy(), df["i"].to_numpy(dtype=float))
+    return df
@@ -1,5 +1,8 @@
 import pandas as pd
 import streamlit as st
+from classification import build_lookup_table
+from orbit_calculations import object_positions
+from proximity import build_position_index
 
 @st.cache_data
 def load_data(path):
@@ -25,3 +28,22 @@ def prepare_dataframe(df):
             df[col] = pd.to_numeric(df[col], errors="coerce")
     df = df.dropna(subset=["a", "e"])
     return df
+
+
+@st.cache_data
+def load_komet_lookup_table(path="clustering/komet_vs_asteroid_clusters_dbscan.csv"):
+    """Baut die Komet/Asteroid-Lookup-Tabelle einmalig aus den DBSCAN-Labels des Notebooks."""
+    labeled = pd.read_csv(path).dropna(subset=["t_jup", "i", "cluster"])
+    return build_lookup_table(labeled["t_jup"], labeled["i"], labeled["cluster"].astype(int))
+
+
+# Ein Index pro Datensatz und Tag; ältere Epochen werden verdrängt, damit ein
+# dauerhaft laufender Server nicht jeden Tag einen weiteren KD-Baum ansammelt
+@st.cache_resource(max_entries=5)
+def load_position_index(path, jd):
+    """
+    Räumlicher Index über die Positionen aller Objekte einer CSV zum Datum 'jd'.
+    Wird pro Datensatz und Epoche nur einmal gebaut.
+    """
+    df = prepare_dataframe(load_data(path))
+    return build_position_index(object_positions(df, jd))
@@ -1,8 +1,104 @@
 import numpy as np
+import pandas as pd
 import plotly.graph_objects as go
 
 
-def compute_object_positions(fig, df, cluster_column=None):
+# Gaußsche Gravitationskonstante in Grad pro Tag (mittlere Bewegung bei a = 1 AE)
+GAUSS_K_DEG = 0.9856076686
+
+
+def solve_kepler_array(M, e, tol=1e-8, max_iter=50):
+    """
+    Löst die Kepler-Gleichung für ganze Arrays auf einmal (Newton-Verfahren).
+    Elliptisch (e < 1): M = E - e*sin(E), hyperbolisch (e > 1): M = e*sinh(H) - H.
+    """
+    M, e = np.broadcast_arrays(np.asarray(M, dtype=float), np.asarray(e, dtype=float))
+    E = np.full(M.shape, np.nan)
+    hyper = e > 1
+    ell = e < 1
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        # Elliptische Bahnen
+        Me, ee = M[ell], e[ell]
+        Ee = np.where(ee < 0.8, Me, np.pi)
+        for _ in range(max_iter):
+            dE = (Ee - ee * np.sin(Ee) - Me) / (1 - ee * np.cos(Ee))
+            Ee -= dE
+            # NaN-Zeilen (fehlende Bahnelemente) zählen als konvergiert
+            if not np.any(np.abs(dE) >= tol):
+                break
+        E[ell] = Ee
+
+        # Hyperbolische Bahnen
+        Mh, eh = M[hyper], e[hyper]
+        Eh = np.arcsinh(Mh / eh)
+        for _ in range(max_iter):
+            dE = (eh * np.sinh(Eh) - Eh - Mh) / (eh * np.cosh(Eh) - 1)
+            Eh -= dE
+            if not np.any(np.abs(dE) >= tol):
+                break
+        E[hyper] = Eh
+    return E
+
+
+def rotate_to_ecliptic(x, y, inc, om, w):
+    """Dreht Punkte aus der Bahnebene ins ekliptische Koordinatensystem (Winkel in Radiant)."""
+    X = (
+        (np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(inc)) * x
+        + (-np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(inc)) * y
+    )
+    Y = (
+        (np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(inc)) * x
+        + (-np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(inc)) * y
+    )
+    Z = (np.sin(w) * np.sin(inc)) * x + (np.cos(w) * np.sin(inc)) * y
+    return X, Y, Z
+
+
+def object_positions(df, jd=None):
+    """
+    Berechnet die heliozentrischen Positionen aller Objekte vektorisiert.
+    Gibt ein (N, 3)-Array zurück, Zeilen ohne gültige Bahn sind NaN.
+    Mit 'jd' (Julianisches Datum) wird die mittlere Anomalie von der Spalte
+    'epoch' aus auf dieses Datum fortgeschrieben, sonst gilt die Katalog-Epoche.
+    """
+    a = df["a"].to_numpy(dtype=float)
+    e = df["e"].to_numpy(dtype=float)
+    inc, om, w = (np.radians(df[col].to_numpy(dtype=float)) for col in ("i", "om", "w"))
+    M_deg = df["M"].to_numpy(dtype=float)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        # Mittlere Bewegung nach Keplers drittem Gesetz
+        if jd is not None and "epoch" in df.columns:
+            n = GAUSS_K_DEG / np.abs(a) ** 1.5
+            M_deg = M_deg + n * (jd - pd.to_numeric(df["epoch"], errors="coerce").to_numpy(dtype=float))
+
+        hyper = e > 1
+        M = np.where(hyper, np.radians(M_deg), np.radians(np.mod(M_deg, 360)))
+        E = solve_kepler_array(M, e)
+
+        # Position in der Bahnebene (elliptisch bzw. hyperbolisch)
+        x0 = np.where(hyper, a * (np.cosh(E) - e), a * (np.cos(E) - e))
+        y0 = np.where(
+            hyper,
+            -a * np.sqrt(e**2 - 1) * np.sinh(E),
+            a * np.sqrt(1 - e**2) * np.sin(E),
+        )
+
+    # Parabolische Bahnen (e = 1) haben keine große Halbachse
+    x0[e == 1] = np.nan
+    y0[e == 1] = np.nan
+
+    return np.column_stack(rotate_to_ecliptic(x0, y0, inc, om, w))
+
+
+def _object_texts(df):
+    if "full_name" in df.columns:
+        return df["full_name"].fillna("Objekt").tolist()
+    return ["Objekt"] * len(df)
+
+
+def compute_object_positions(fig, df, cluster_column=None, jd=None):
     """
     Fügt die aktuellen Positionen der Objekte als Punkte in die Figur ein.
     Erzeugt die Cluster-Legende, falls Cluster vorhanden sind.
@@ -15,6 +111,10 @@ def compute_object_positions(fig, df, cluster_column=None):
         "brown", "gold"
     ]
 
+    # Positionen aller Objekte in einem Schritt berechnen
+    positions = object_positions(df, jd)
+    texts = np.array(_object_texts(df), dtype=object)
+
     color_map = None
     if cluster_column is not None and cluster_column in df.columns:
         clusters = df[cluster_column].dropna().unique()
@@ -36,41 +136,9 @@ def compute_object_positions(fig, df, cluster_column=None):
         
         # Iteriere über die Cluster-Map, um separate Traces zu erstellen
         for cl_val, color in color_map.items():
-            subset = df[df[cluster_column] == cl_val]
-            if subset.empty:
+            mask = (df[cluster_column] == cl_val).to_numpy()
+            if not mask.any():
                 continue
-            
-            Xs, Ys, Zs, texts = [], [], [], []
-            
-            # Berechne die Positionen für das aktuelle Subset
-            for _, row in subset.iterrows():
-                a, e = row["a"], row["e"]
-                inc, om, w, M = (
-                    np.radians(row["i"]),
-                    np.radians(row["om"]),
-                    np.radians(row["w"]),
-                    np.radians(row["M"]),
-                )
-                
-                # Berechnung der Position (Kepler-Näherung)
-                r_now = (a * (1 - e**2)) / (1 + e * np.cos(M))
-                x0, y0 = r_now * np.cos(M), r_now * np.sin(M)
-                
-                # Rotation ins ekliptische Koordinatensystem
-                X0 = (
-                    (np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(inc)) * x0
-                    + (-np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(inc)) * y0
-                )
-                Y0 = (
-                    (np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(inc)) * x0
-                    + (-np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(inc)) * y0
-                )
-                Z0 = (np.sin(w) * np.sin(inc)) * x0 + (np.cos(w) * np.cos(inc)) * y0
-
-                Xs.append(X0)
-                Ys.append(Y0)
-                Zs.append(Z0)
-                texts.append(row.get("full_name", "Objekt"))
 
             # Legendenname und Sichtbarkeit
             legend_name = "Noise" if cl_val in (-1, "-1") else f"Cluster {cl_val}"
@@ -79,12 +147,12 @@ def compute_object_positions(fig, df, cluster_column=None):
             # Füge Punkte-Trace pro Cluster hinzu (mit Legende)
             fig.add_trace(
                 go.Scatter3d(
-                    x=Xs,
-                    y=Ys,
-                    z=Zs,
+                    x=positions[mask, 0],
+                    y=positions[mask, 1],
+                    z=positions[mask, 2],
                     mode="markers",
                     marker=dict(size=2, color=color, opacity=0.85),
-                    text=texts,
+                    text=texts[mask],
                     hoverinfo="text",
                     name=legend_name, # Name für die Legende
                     showlegend=show_leg, # Legende aktiv
@@ -94,40 +162,11 @@ def compute_object_positions(fig, df, cluster_column=None):
             
     else:
         # Fallback für ungeclusterte Daten (alle rot, keine Legende)
-        Xs, Ys, Zs, texts = [], [], [], []
-
-        for _, row in df.iterrows():
-            a, e = row["a"], row["e"]
-            inc, om, w, M = (
-                np.radians(row["i"]),
-                np.radians(row["om"]),
-                np.radians(row["w"]),
-                np.radians(row["M"]),
-            )
-
-            r_now = (a * (1 - e**2)) / (1 + e * np.cos(M))
-            x0, y0 = r_now * np.cos(M), r_now * np.sin(M)
-            
-            X0 = (
-                (np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(inc)) * x0
-                + (-np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(inc)) * y0
-            )
-            Y0 = (
-                (np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(inc)) * x0
-                + (-np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(inc)) * y0
-            )
-            Z0 = (np.sin(w) * np.sin(inc)) * x0 + (np.cos(w) * np.cos(inc)) * y0
-
-            Xs.append(X0)
-            Ys.append(Y0)
-            Zs.append(Z0)
-            texts.append(row.get("full_name", "Objekt"))
-
         fig.add_trace(
             go.Scatter3d(
-                x=Xs,
-                y=Ys,
-                z=Zs,
+                x=positions[:, 0],
+                y=positions[:, 1],
+                z=positions[:, 2],
                 mode="markers",
                 marker=dict(size=2, color="red", opacity=0.85), # Standardfarbe
                 text=texts,
@@ -138,6 +177,43 @@ def compute_object_positions(fig, df, cluster_column=None):
         )
 
 
+def add_highlighted_objects(fig, df, jd=None, name="Treffer"):
+    """Hebt ausgewählte Objekte (z.B. Treffer einer Nachbarschaftssuche) hervor."""
+    positions = object_positions(df, jd)
+    fig.add_trace(
+        go.Scatter3d(
+            x=positions[:, 0],
+            y=positions[:, 1],
+            z=positions[:, 2],
+            mode="markers",
+            marker=dict(size=6, color="white", symbol="circle-open"),
+            text=_object_texts(df),
+            hoverinfo="text",
+            name=name,
+            showlegend=True,
+        )
+    )
+
+
+def object_orbit_curves(df, n_samples=250):
+    """
+    Bahnkurven aller Objekte in einem Schritt, Ergebnis hat die Form (N, n_samples, 3).
+    Äste hyperbolischer Bahnen ohne physikalische Lösung (r < 0) sind NaN.
+    """
+    a = df["a"].to_numpy(dtype=float)[:, None]
+    e = df["e"].to_numpy(dtype=float)[:, None]
+    inc, om, w = (np.radians(df[col].to_numpy(dtype=float))[:, None] for col in ("i", "om", "w"))
+
+    # Punkte entlang der Bahn
+    theta = np.linspace(0, 2 * np.pi, n_samples)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (a * (1 - e**2)) / (1 + e * np.cos(theta))
+    r[r < 0] = np.nan
+    x, y = r * np.cos(theta), r * np.sin(theta)
+
+    return np.stack(rotate_to_ecliptic(x, y, inc, om, w), axis=-1)
+
+
 def add_object_orbits(fig, df, cluster_column=None):
     """
     Fügt die Bahnkurven der Objekte als Linien in die Figur ein.
@@ -151,6 +227,9 @@ def add_object_orbits(fig, df, cluster_column=None):
         "brown", "gold"
     ]
 
+    # Alle Bahnen in einem Schritt berechnen
+    curves = object_orbit_curves(df)
+
     color_map = None
     if cluster_column is not None and cluster_column in df.columns:
         clusters = df[cluster_column].dropna().unique()
@@ -169,41 +248,15 @@ def add_object_orbits(fig, df, cluster_column=None):
 
         # --- Füge Bahnen pro Cluster hinzu (Farbe und Legenden-Zuordnung) ---
         for cl_val, color in color_map.items():
-            subset = df[df[cluster_column] == cl_val]
+            mask = (df[cluster_column] == cl_val).to_numpy()
 
-            if subset.empty:
+            if not mask.any():
                 continue
 
-            X_all, Y_all, Z_all = [], [], []
-
-            # Alle Bahnen dieses Clusters berechnen
-            for _, row in subset.iterrows():
-                a, e = row["a"], row["e"]
-                inc, om, w = (
-                    np.radians(row["i"]),
-                    np.radians(row["om"]),
-                    np.radians(row["w"]),
-                )
-
-                # Punkte entlang der Bahn
-                theta = np.linspace(0, 2 * np.pi, 250)
-                r = (a * (1 - e**2)) / (1 + e * np.cos(theta))
-                x, y = r * np.cos(theta), r * np.sin(theta)
-
-                # Rotationsmatrix
-                X = (
-                    (np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(inc)) * x
-                    + (-np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(inc)) * y
-                )
-                Y = (
-                    (np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(inc)) * x
-                    + (-np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(inc)) * y
-                )
-                Z = (np.sin(w) * np.sin(inc)) * x + (np.cos(w) * np.cos(inc)) * y 
-
-                X_all.extend(X.tolist() + [None])
-                Y_all.extend(Y.tolist() + [None])
-                Z_all.extend(Z.tolist() + [None])
+            # Bahnen hintereinanderhängen, eine NaN-Zeile trennt die einzelnen Kurven
+            subset = curves[mask]
+            gaps = np.full((len(subset), 1, 3), np.nan)
+            X_all, Y_all, Z_all = np.concatenate([subset, gaps], axis=1).reshape(-1, 3).T
 
             # Legendenname für die Zuordnung
             legend_name = "Noise" if cl_val in (-1, "-1") else f"Cluster {cl_val}"
@@ -226,41 +279,21 @@ def add_object_orbits(fig, df, cluster_column=None):
 
     else:
         # Fallback für ungeclusterte Daten: Jede Bahn einzeln, keine Legende
-        for _, row in df.iterrows():
-            a, e = row["a"], row["e"]
-            inc, om, w = (
-                np.radians(row["i"]),
-                np.radians(row["om"]),
-                np.radians(row["w"]),
-            )
-
-            theta = np.linspace(0, 2 * np.pi, 250)
-            r = (a * (1 - e**2)) / (1 + e * np.cos(theta))
-            x, y = r * np.cos(theta), r * np.sin(theta)
-
-            X = (
-                (np.cos(om) * np.cos(w) - np.sin(om) * np.sin(w) * np.cos(inc)) * x
-                + (-np.cos(om) * np.sin(w) - np.sin(om) * np.cos(w) * np.cos(inc)) * y
-            )
-            Y = (
-                (np.sin(om) * np.cos(w) + np.cos(om) * np.sin(w) * np.cos(inc)) * x
-                + (-np.sin(om) * np.sin(w) + np.cos(om) * np.cos(w) * np.cos(inc)) * y
-            )
-            Z = (np.sin(w) * np.sin(inc)) * x + (np.cos(w) * np.cos(inc)) * y
-
+        names = df["full_name"].tolist() if "full_name" in df.columns else ["Orbit"] * len(df)
+        for curve, name in zip(curves, names):
             line_color = "red"
 
             fig.add_trace(
                 go.Scatter3d(
-                    x=X,
-                    y=Y,
-                    z=Z,
+                    x=curve[:, 0],
+                    y=curve[:, 1],
+                    z=curve[:, 2],
                     mode="lines",
                     line=dict(width=1, color=line_color),
                     opacity=1,
-                    name=row.get("full_name", "Orbit"),
-                    text=row.get("full_name", "Orbit"),
+                    name=name,
+                    text=name,
                     hoverinfo="text",
                     showlegend=False, # KEINE Legende für ungeclusterte Bahnen
                 )
-            )
\ No newline at end of file
+            )
@@ -1,90 +1,130 @@
 import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timezone
+from orbit_calculations import solve_kepler_array, rotate_to_ecliptic
 
-# --- Bahnelemente (ungefähr für Epoche J2000) ---
-PLANETS = {
-    "Mercury": {"a": 0.3871, "e": 0.2056, "i": 7.005, "om": 48.331, "w": 29.124, "M0": 174.795},
-    "Venus":   {"a": 0.7233, "e": 0.0067, "i": 3.394, "om": 76.680, "w": 54.884, "M0": 50.115},
-    "Earth":   {"a": 1.0000, "e": 0.0167, "i": 0.000, "om": -11.260, "w": 114.207, "M0": 357.529},
-    "Mars":    {"a": 1.5237, "e": 0.0934, "i": 1.850, "om": 49.558, "w": 286.502, "M0": 19.412},
-    "Jupiter": {"a": 5.2028, "e": 0.0484, "i": 1.303, "om": 100.464, "w": 273.867, "M0": 20.020},
-    "Saturn":  {"a": 9.5388, "e": 0.0542, "i": 2.485, "om": 113.665, "w": 339.392, "M0": 317.020},
-    "Uranus":  {"a": 19.191, "e": 0.0472, "i": 0.770, "om": 74.006,  "w": 96.998,  "M0": 142.238},
-    "Neptune": {"a": 30.068, "e": 0.0086, "i": 1.770, "om": 131.784, "w": 272.846, "M0": 256.228},
-}
-
-
-def solve_kepler(M, e, tol=1e-8):
-    """Löst die Kepler-Gleichung M = E - e*sin(E) für die exzentrische Anomalie E."""
-    E = M if e < 0.8 else np.pi
-    while True:
-        dE = (M - (E - e*np.sin(E))) / (1 - e*np.cos(E))
-        E += dE
-        if abs(dE) < tol:
-            break
-    return E
-
-
-def add_planet_orbits(fig, planets):
-    """Zeichnet Planetenbahnen, berechnet aktuelle Positionen und fügt Sonne hinzu."""
-    now = datetime.now(timezone.utc)
+# Julianisches Datum der Epoche J2000
+J2000_JD = 2451545.0
+
+# --- Bahnelemente ---
+# Mittlere Elemente zur Epoche J2000 plus lineare (säkulare) Änderung pro Julianischem
+# Jahrhundert, gültig etwa 1800–2050 (JPL, "Approximate Positions of the Planets").
+# L = mittlere Länge, varpi = Länge des Perihels, om = Länge des aufsteigenden Knotens;
+# Earth steht für das Erde-Mond-Baryzentrum. Winkel in Grad, a in AE.
+PLANET_DTYPE = np.dtype([
+    ("name", "U8"),
+    ("a", "f8"), ("e", "f8"), ("i", "f8"), ("L", "f8"), ("varpi", "f8"), ("om", "f8"),
+    ("a_dot", "f8"), ("e_dot", "f8"), ("i_dot", "f8"), ("L_dot", "f8"), ("varpi_dot", "f8"), ("om_dot", "f8"),
+])
+
+PLANETS = np.array([
+    ("Mercury", 0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593,
+     0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081),
+    ("Venus", 0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255,
+     0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418),
+    ("Earth", 1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0,
+     0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0),
+    ("Mars", 1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891,
+     0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343),
+    ("Jupiter", 5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909,
+     -0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106),
+    ("Saturn", 9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448,
+     -0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794),
+    ("Uranus", 19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503,
+     -0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589),
+    ("Neptune", 30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574,
+     0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.01262724),
+], dtype=PLANET_DTYPE)
+
+
+def planet_index(planets, name):
+    """Zeilenindex eines Planeten im strukturierten Array."""
+    return int(np.flatnonzero(planets["name"] == name)[0])
+
+
+def days_since_j2000(when=None):
+    """Tage seit der Epoche J2000 (Standard: jetzt, UTC)."""
+    if when is None:
+        when = datetime.now(timezone.utc)
     epoch = datetime(2000, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
-    days_since = (now - epoch).total_seconds() / (3600 * 24)
-    
-    # Jahre seit J2000 für genauere Berechnung
-    years_since = days_since / 365.25
+    return (when - epoch).total_seconds() / (3600 * 24)
 
-    for name, el in planets.items():
-        a, e = el["a"], el["e"]
-        i, om, w, M0 = map(np.radians, [el["i"], el["om"], el["w"], el["M0"]])
 
-        # --- Orbit-Kurve ---
-        theta = np.linspace(0, 2*np.pi, 400)
-        r = (a * (1 - e**2)) / (1 + e * np.cos(theta))
-        x_orb, y_orb = r * np.cos(theta), r * np.sin(theta)
+def julian_date(when=None):
+    """Julianisches Datum (Standard: jetzt, UTC)."""
+    return J2000_JD + days_since_j2000(when)
+
+
+def planet_elements(planets, jd):
+    """
+    Bahnelemente aller Planeten zu beliebig vielen Zeitpunkten in einem Schritt.
+    Gibt ein Dict mit Arrays der Form (Planeten,) + jd.shape zurück (Winkel in Radiant).
+    """
+    jd = np.asarray(jd, dtype=float)
+    # Julianische Jahrhunderte seit J2000, als Achse hinter der Planeten-Achse
+    T = ((jd - J2000_JD) / 36525.0)[None, ...]
+    extra = (slice(None),) + (None,) * jd.ndim
+
+    def at(field):
+        return planets[field][extra] + planets[field + "_dot"][extra] * T
+
+    L, varpi, om = at("L"), at("varpi"), at("om")
+    return {
+        "a": at("a"),
+        "e": at("e"),
+        "i": np.radians(at("i")),
+        "om": np.radians(om),
+        "w": np.radians(varpi - om),
+        # Mittlere Anomalie auf (-180°, 180°] reduzieren
+        "M": np.radians((L - varpi + 180.0) % 360.0 - 180.0),
+    }
 
-        X_orb = (np.cos(om)*np.cos(w)-np.sin(om)*np.sin(w)*np.cos(i))*x_orb + \
-                (-np.cos(om)*np.sin(w)-np.sin(om)*np.cos(w)*np.cos(i))*y_orb
-        Y_orb = (np.sin(om)*np.cos(w)+np.cos(om)*np.sin(w)*np.cos(i))*x_orb + \
-                (-np.sin(om)*np.sin(w)+np.cos(om)*np.cos(w)*np.cos(i))*y_orb
-        Z_orb = (np.sin(w)*np.sin(i))*x_orb + (np.cos(w)*np.sin(i))*y_orb
 
+def planet_positions(planets, jd):
+    """
+    Heliozentrische Positionen aller Planeten für ein oder mehrere Julianische Daten.
+    Ergebnis hat die Form (Planeten,) + jd.shape + (3,).
+    """
+    el = planet_elements(planets, jd)
+    E = solve_kepler_array(el["M"], el["e"])
+
+    # Position in der Bahnebene direkt aus der exzentrischen Anomalie
+    x0 = el["a"] * (np.cos(E) - el["e"])
+    y0 = el["a"] * np.sqrt(1 - el["e"]**2) * np.sin(E)
+
+    return np.stack(rotate_to_ecliptic(x0, y0, el["i"], el["om"], el["w"]), axis=-1)
+
+
+def planet_orbit_curves(planets, jd, n_samples=400):
+    """
+    Bahnkurven aller Planeten zu einem oder mehreren Zeitpunkten.
+    Ergebnis hat die Form (Planeten,) + jd.shape + (n_samples, 3).
+    """
+    el = {k: v[..., None] for k, v in planet_elements(planets, jd).items()}
+    theta = np.linspace(0, 2*np.pi, n_samples)
+    r = (el["a"] * (1 - el["e"]**2)) / (1 + el["e"] * np.cos(theta))
+    x_orb, y_orb = r * np.cos(theta), r * np.sin(theta)
+
+    return np.stack(rotate_to_ecliptic(x_orb, y_orb, el["i"], el["om"], el["w"]), axis=-1)
+
+
+def add_planet_orbits(fig, planets, when=None):
+    """Zeichnet Planetenbahnen, berechnet aktuelle Positionen und fügt Sonne hinzu."""
+    jd = julian_date(when)
+
+    # Bahnen und Positionen aller Planeten in einem Schritt
+    orbits = planet_orbit_curves(planets, jd)
+    positions = planet_positions(planets, jd)
+
+    for name, orbit, (X0, Y0, Z0) in zip(planets["name"], orbits, positions):
+        # --- Orbit-Kurve ---
         fig.add_trace(go.Scatter3d(
-            x=X_orb, y=Y_orb, z=Z_orb,
+            x=orbit[:, 0], y=orbit[:, 1], z=orbit[:, 2],
             mode="lines", line=dict(width=1), name=f"{name} Orbit",
             showlegend=False
         ))
 
         # --- aktuelle Position ---
-        # Vereinfachte Berechnung: mittlere Anomalie für heutiges Datum
-        # Umlaufzeit in Jahren: P = a^(3/2)
-        P_years = a ** 1.5  # Keplers drittes Gesetz
-        
-        # Mittlere Anomalie in Grad für heutiges Datum
-        M_deg = (M0 + (360 / P_years) * years_since) % 360
-        M = np.radians(M_deg)
-        
-        # Exzentrische Anomalie mit Kepler-Gleichung
-        E = solve_kepler(M, e)
-        
-        # Wahre Anomalie
-        v = 2 * np.arctan2(np.sqrt(1 + e) * np.sin(E / 2),
-                           np.sqrt(1 - e) * np.cos(E / 2))
-        
-        # Entfernung
-        r_now = a * (1 - e * np.cos(E))
-        
-        # Position in der Bahnebene
-        x0, y0 = r_now * np.cos(v), r_now * np.sin(v)
-
-        # Rotation ins ekliptische Koordinatensystem
-        X0 = (np.cos(om)*np.cos(w)-np.sin(om)*np.sin(w)*np.cos(i))*x0 + \
-             (-np.cos(om)*np.sin(w)-np.sin(om)*np.cos(w)*np.cos(i))*y0
-        Y0 = (np.sin(om)*np.cos(w)+np.cos(om)*np.sin(w)*np.cos(i))*x0 + \
-             (-np.sin(om)*np.sin(w)+np.cos(om)*np.cos(w)*np.cos(i))*y0
-        Z0 = (np.sin(w)*np.sin(i))*x0 + (np.cos(w)*np.sin(i))*y0
-
         fig.add_trace(go.Scatter3d(
             x=[X0], y=[Y0], z=[Z0],
             mode="markers+text",
@@ -104,4 +144,4 @@ def add_planet_orbits(fig, planets):
         textposition="top center",
         name="Sun",
         showlegend=False
-    ))
\ No newline at end of file
+    ))
@@ -0,0 +1,56 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def build_position_index(positions):
+    """
+    Baut einen KD-Baum über die XYZ-Positionen (N, 3) aller Objekte.
+    Zeilen mit NaN (keine gültige Bahn) werden ausgelassen, 'rows' bildet
+    die Baum-Indizes zurück auf die Zeilen des Katalogs ab.
+    """
+    positions = np.asarray(positions, dtype=float)
+    valid = np.isfinite(positions).all(axis=1)
+    return {
+        "tree": cKDTree(positions[valid]),
+        "rows": np.flatnonzero(valid),
+        "positions": positions,
+    }
+
+
+def query_radius(index, center, radius, exclude=None):
+    """
+    Alle Objekte innerhalb von 'radius' (AE) um 'center' (X, Y, Z).
+    Gibt (Katalogzeilen, Abstände) aufsteigend nach Abstand sortiert zurück.
+    """
+    center = np.asarray(center, dtype=float)
+    hits = np.asarray(index["tree"].query_ball_point(center, radius), dtype=np.int64)
+    rows = index["rows"][hits]
+    dist = np.linalg.norm(index["positions"][rows] - center, axis=1)
+
+    if exclude is not None:
+        keep = rows != exclude
+        rows, dist = rows[keep], dist[keep]
+
+    order = np.argsort(dist, kind="stable")
+    return rows[order], dist[order]
+
+
+def query_nearest(index, center, k, exclude=None):
+    """
+    Die k nächsten Objekte um 'center' (X, Y, Z).
+    Mit 'exclude' wird eine Katalogzeile (z.B. das Zentrumsobjekt selbst) übersprungen.
+    """
+    n_valid = len(index["rows"])
+    k_query = min(k + (exclude is not None), n_valid)
+    if k_query == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    dist, hits = index["tree"].query(np.asarray(center, dtype=float), k=k_query)
+    rows = index["rows"][np.atleast_1d(hits)]
+    dist = np.atleast_1d(dist)
+
+    if exclude is not None:
+        keep = rows != exclude
+        rows, dist = rows[keep], dist[keep]
+
+    return rows[:k], dist[:k]